@@ -1,6 +1,7 @@
 import os
-import json
-import base64
+import binascii
+import hmac
+import orjson
 from typing import Optional
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -28,6 +29,11 @@ class UserInDB(BaseModel):
     name: Optional[str] = None
 
 mock_users_db: dict[str, UserInDB] = {} # email -> UserInDB
+mock_users_by_id: dict[str, UserInDB] = {} # id -> UserInDB
+
+# Token header and mock signature never change, so encode them once at import
+_HEADER = "header"
+_MOCK_SIG = binascii.b2a_base64(SECRET_KEY.encode(), newline=False).rstrip(b'=').decode()
 
 # --- JWT Utility Functions ---
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -39,10 +45,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire.timestamp()}) # Convert datetime to timestamp
     # For a real JWT, you'd use `jwt.encode` here.
     # For this mock, we'll just base64 encode the payload.
-    encoded_jwt_payload = base64.b64encode(json.dumps(to_encode).encode('utf-8')).decode('utf-8').replace('=', '')
-    # Mock signature
-    mock_signature = base64.b64encode(SECRET_KEY.encode('utf-8')).decode('utf-8').replace('=', '')
-    return f"header.{encoded_jwt_payload}.{mock_signature}"
+    encoded_jwt_payload = binascii.b2a_base64(orjson.dumps(to_encode), newline=False).rstrip(b'=').decode()
+    return f"{_HEADER}.{encoded_jwt_payload}.{_MOCK_SIG}"
 
 
 def verify_mock_jwt_token(token: str) -> dict:
@@ -67,15 +71,10 @@ def verify_mock_jwt_token(token: str) -> dict:
         if len(parts) != 3:
             raise ValueError("Invalid token format")
 
-        # Decode payload (middle part)
+        # Decode payload (middle part), restoring the stripped padding
         payload_b64 = parts[1]
-        # Add padding if needed
-        padding = 4 - len(payload_b64) % 4
-        if padding != 4:
-            payload_b64 += '=' * padding
-
-        payload_json = base64.b64decode(payload_b64).decode('utf-8')
-        payload = json.loads(payload_json)
+        payload_json = binascii.a2b_base64(payload_b64 + '=' * (-len(payload_b64) % 4))
+        payload = orjson.loads(payload_json)
 
         # Check token expiry for mock
         if "exp" in payload:
@@ -128,7 +127,7 @@ def get_current_user(
     """
     Retrieve the full user object for the authenticated user.
     """
-    user = next((u for u in mock_users_db.values() if u.id == current_user_id), None)
+    user = mock_users_by_id.get(current_user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -189,6 +188,7 @@ async def register_user(user_data: UserCreate):
         name=user_data.name
     )
     mock_users_db[user.email] = user
+    mock_users_by_id[user.id] = user
 
     access_token = create_access_token(data={"sub": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
@@ -197,7 +197,10 @@ async def register_user(user_data: UserCreate):
 async def login_for_access_token(user_data: UserLogin):
     user = mock_users_db.get(user_data.email)
 
-    if not user or user.hashed_password != user_data.password + "_hashed": # Mock password verification
+    # Mock password verification; compare as bytes since compare_digest rejects non-ASCII str
+    if not user or not hmac.compare_digest(
+        user.hashed_password.encode(), (user_data.password + "_hashed").encode()
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
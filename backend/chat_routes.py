@@ -1,11 +1,11 @@
 import os
-import json
 import re
+from collections import OrderedDict
 import google.generativeai as genai
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlmodel import Session, select
-from typing import Optional, List
+from sqlmodel import Session, func, select
+from typing import Any, Optional, List
 from mcp_server import MCPTools, get_gemini_tool_definitions
 from models import Message, Conversation
 from database import get_session
@@ -23,41 +23,169 @@ model = genai.GenerativeModel(
     tools=get_gemini_tool_definitions()
 )
 
+# Rule-based fallback: intent keyword plus an optional task ID right after it,
+# matched case-insensitively on the original text so offsets stay aligned.
+# Each canonical intent is a named group (underscores for spaces) and dispatch uses
+# match.lastgroup: IGNORECASE accepts variants like "lıst tasks" (dotless i) that no
+# casefolded lookup key would.
+_INTENT_RE = re.compile(
+    r"(?P<add_task>add task)"
+    r"|(?P<list_tasks>list tasks|show tasks)"
+    r"|(?P<complete_task>complete task|mark task)"
+    r"|(?P<delete_task>delete task|remove task)",
+    re.IGNORECASE,
+)
+_TASK_ID_RE = re.compile(r"\s+(\d+)")
+
+
+def _templated_tool_reply(tool_name: str, args: dict, res: dict) -> Optional[str]:
+    """
+    Describe the result of a single-task tool call without asking Gemini.
+    Returns None when the output needs the model to summarise it.
+    """
+    if tool_name not in ("add_task", "complete_task", "delete_task"):
+        return None
+    if "error" in res:
+        return res["error"]
+    if tool_name == "add_task":
+        return f"Task '{res.get('title', args.get('title'))}' added successfully."
+    if tool_name == "complete_task":
+        return f"Task '{res.get('title')}' marked as completed."
+    # Gemini sends numeric arguments as floats
+    return f"Task {int(args['task_id'])} deleted successfully."
+
+
+# Reconstructed Gemini history per conversation:
+# conversation_id -> (last message id, messages seen with id <= last id, history).
+# Ids are assigned at flush but rows only become visible at commit, so a concurrent turn can
+# commit a lower id after a higher one was cached; the count check below catches that gap.
+_HISTORY_CACHE_SIZE = 1024
+_history_cache: "OrderedDict[int, tuple[int, int, list]]" = OrderedDict()
+
+
+def _append_history(history: list, m) -> None:
+    """Append the Gemini history entries for one stored message row."""
+    if m.tool_name and m.tool_arguments is not None:
+        # Tool fields are JSON columns, so the driver has already decoded them;
+        # if they don't fit Gemini's types, fall back to plain text to avoid 500s.
+        try:
+            history.append(
+                {
+                    "role": "model",
+                    "parts": [
+                        genai.types.FunctionCall(
+                            name=m.tool_name,
+                            args=m.tool_arguments,
+                        )
+                    ],
+                }
+            )
+            if m.tool_output is not None:
+                history.append(
+                    {
+                        "role": "function",
+                        "parts": [
+                            genai.types.FunctionResponse(
+                                name=m.tool_name,
+                                response=m.tool_output,
+                            )
+                        ],
+                    }
+                )
+            return
+        except Exception:
+            # Unexpected shape in tool fields; just fall through and use text.
+            pass
+
+    if m.text:
+        role = "user" if m.sender == "user" else "model"
+        history.append({"role": role, "parts": [m.text]})
+
+
+def _load_history(session: Session, conversation_id: int) -> list:
+    """Return the conversation's Gemini history, extending the cached copy with new messages."""
+    last_id, seen, history = _history_cache.pop(conversation_id, (0, 0, []))
+    if last_id:
+        committed = session.exec(
+            select(func.count())
+            .select_from(Message)
+            .where(Message.conversation_id == conversation_id, Message.id <= last_id)
+        ).one()
+        if committed != seen:
+            last_id, seen, history = 0, 0, []
+
+    # Plain column rows skip ORM hydration and the identity map
+    new_messages = session.exec(
+        select(
+            Message.id,
+            Message.sender,
+            Message.text,
+            Message.tool_name,
+            Message.tool_arguments,
+            Message.tool_output,
+        )
+        .where(Message.conversation_id == conversation_id, Message.id > last_id)
+        .order_by(Message.timestamp)
+    ).all()
+
+    for m in new_messages:
+        _append_history(history, m)
+        last_id = max(last_id, m.id)
+    seen += len(new_messages)
+
+    _history_cache[conversation_id] = (last_id, seen, history)
+    if len(_history_cache) > _HISTORY_CACHE_SIZE:
+        _history_cache.popitem(last=False)
+    return history
+
+
 class ChatRequest(BaseModel):
     message: str
     conversation_id: Optional[int] = None
 
 
-def _rule_based_tool_handler(user_id: str, message: str, mcp: MCPTools) -> tuple[str, Optional[str], Optional[str]]:
+def _parse_intent(text: str) -> tuple[Optional[str], Optional[int], str]:
+    """
+    Find the first recognised intent in one regex pass.
+    Returns (intent, task_id, tail): the canonical intent, the task ID written
+    right after the keyword (if any) and the rest of the message after the keyword.
+    """
+    match = _INTENT_RE.search(text)
+    if not match:
+        return None, None, ""
+    id_match = _TASK_ID_RE.match(text, match.end())
+    task_id = int(id_match.group(1)) if id_match else None
+    return match.lastgroup.replace("_", " "), task_id, text[match.end():].strip()
+
+
+def _rule_based_tool_handler(user_id: str, message: str, mcp: MCPTools) -> tuple[str, Optional[str], Optional[Any]]:
     """
     Fallback handler when Gemini is unavailable.
     Parses very simple natural language patterns and calls tools directly.
-    Returns (ai_text, tool_name, tool_output_json).
+    Returns (ai_text, tool_name, tool_output).
     """
-    text = message.strip()
-    lower = text.lower()
+    intent, task_id, tail = _parse_intent(message.strip())
 
     tool_name: Optional[str] = None
-    tool_output_json: Optional[str] = None
+    tool_output = None
 
     # Add task: e.g. "add task buy milk" / "add task to buy milk"
-    if "add task" in lower:
-        idx = lower.find("add task") + len("add task")
-        raw_title = text[idx:].strip()
-        if raw_title.lower().startswith("to "):
+    if intent == "add task":
+        raw_title = tail
+        if raw_title[:3].casefold() == "to ":
             raw_title = raw_title[3:].strip()
         if not raw_title:
             raw_title = "New task"
         res = mcp.add_task(user_id=user_id, title=raw_title)
         tool_name = "add_task"
-        tool_output_json = json.dumps(res)
+        tool_output = res
         ai_text = f"Task '{res.get('title', raw_title)}' added successfully."
 
     # List tasks: e.g. "list tasks", "show tasks"
-    elif "list tasks" in lower or "show tasks" in lower:
+    elif intent == "list tasks":
         res = mcp.list_tasks(user_id=user_id)
         tool_name = "list_tasks"
-        tool_output_json = json.dumps(res)
+        tool_output = res
         if not res:
             ai_text = "You have no tasks yet."
         else:
@@ -68,34 +196,25 @@ def _rule_based_tool_handler(user_id: str, message: str, mcp: MCPTools) -> tuple
             ai_text = f"Here are your tasks: {items}."
 
     # Complete task: e.g. "complete task 3", "mark task 3 done", "complete task buy milk"
-    elif "complete task" in lower or "mark task" in lower:
-        match = re.search(r"(?:complete|mark)\s+task\s+(\d+)", lower)
-        if match:
-            task_id = int(match.group(1))
+    elif intent == "complete task":
+        if task_id is not None:
             res = mcp.complete_task(user_id=user_id, task_id=task_id)
             tool_name = "complete_task"
-            tool_output_json = json.dumps(res)
+            tool_output = res
             if "error" in res:
                 ai_text = res["error"]
             else:
                 ai_text = f"Task {task_id} marked as completed."
         else:
             # Try to resolve by title instead of ID
-            trigger = "complete task" if "complete task" in lower else "mark task"
-            idx = lower.find(trigger) + len(trigger)
-            title_query = text[idx:].strip()
+            title_query = tail
             if title_query:
-                tasks = mcp.list_tasks(user_id=user_id)
-                matches = [
-                    t for t in tasks
-                    if title_query.lower() == str(t.get("title", "")).lower()
-                    or title_query.lower() in str(t.get("title", "")).lower()
-                ]
+                matches = mcp.find_tasks_by_title(user_id=user_id, title_query=title_query)
                 if len(matches) == 1:
                     task_id = matches[0]["id"]
                     res = mcp.complete_task(user_id=user_id, task_id=task_id)
                     tool_name = "complete_task"
-                    tool_output_json = json.dumps(res)
+                    tool_output = res
                     if "error" in res:
                         ai_text = res["error"]
                     else:
@@ -109,34 +228,25 @@ def _rule_based_tool_handler(user_id: str, message: str, mcp: MCPTools) -> tuple
                 ai_text = "Please specify which task to complete, for example: 'complete task 3' or 'complete task buy milk'."
 
     # Delete task: e.g. "delete task 3", "remove task 3", "delete task buy milk"
-    elif "delete task" in lower or "remove task" in lower:
-        match = re.search(r"(?:delete|remove)\s+task\s+(\d+)", lower)
-        if match:
-            task_id = int(match.group(1))
+    elif intent == "delete task":
+        if task_id is not None:
             res = mcp.delete_task(user_id=user_id, task_id=task_id)
             tool_name = "delete_task"
-            tool_output_json = json.dumps(res)
+            tool_output = res
             if "error" in res:
                 ai_text = res["error"]
             else:
                 ai_text = f"Task {task_id} deleted successfully."
         else:
             # Try to resolve by title instead of ID
-            trigger = "delete task" if "delete task" in lower else "remove task"
-            idx = lower.find(trigger) + len(trigger)
-            title_query = text[idx:].strip()
+            title_query = tail
             if title_query:
-                tasks = mcp.list_tasks(user_id=user_id)
-                matches = [
-                    t for t in tasks
-                    if title_query.lower() == str(t.get("title", "")).lower()
-                    or title_query.lower() in str(t.get("title", "")).lower()
-                ]
+                matches = mcp.find_tasks_by_title(user_id=user_id, title_query=title_query)
                 if len(matches) == 1:
                     task_id = matches[0]["id"]
                     res = mcp.delete_task(user_id=user_id, task_id=task_id)
                     tool_name = "delete_task"
-                    tool_output_json = json.dumps(res)
+                    tool_output = res
                     if "error" in res:
                         ai_text = res["error"]
                     else:
@@ -153,7 +263,7 @@ def _rule_based_tool_handler(user_id: str, message: str, mcp: MCPTools) -> tuple
         # Generic fallback text when we can't parse intent
         ai_text = "Task processed successfully!"
 
-    return ai_text, tool_name, tool_output_json
+    return ai_text, tool_name, tool_output
 
 @router.post("")
 async def chat_with_ai(
@@ -170,115 +280,89 @@ async def chat_with_ai(
         conv = session.get(Conversation, req.conversation_id)
         if not conv or str(conv.user_id) != str(user_id):
             raise HTTPException(status_code=404, detail="Conversation not found")
+        conv_id = conv.id
+        conv_ref = {"conversation_id": conv_id}
     else:
-        conv = Conversation(user_id=user_id)
-        session.add(conv)
-        session.commit()
-        session.refresh(conv)
+        # A new conversation is inserted together with its first two messages
+        conv_id = None
+        conv_ref = {"conversation": Conversation(user_id=user_id)}
 
-    # 3. Save User Message
-    session.add(Message(conversation_id=conv.id, user_id=user_id, sender="user", text=req.message))
-    session.commit()
+    try:
+        # 3. User Message is kept in memory and saved with the AI reply at the end
+        user_msg = Message(**conv_ref, user_id=user_id, sender="user", text=req.message)
 
-    # 4. History Reconstruction (Using JSON loads instead of eval)
-    history = []
-    past_messages = session.exec(
-        select(Message).where(Message.conversation_id == conv.id).order_by(Message.timestamp)
-    ).all()
-    
-    for m in past_messages:
-        if m.tool_name and m.tool_arguments:
-            # Reconstruct tool calls using safe JSON loading; if parsing fails,
-            # fall back to treating it as plain text to avoid 500s.
-            try:
-                args = json.loads(m.tool_arguments)
-                history.append(
-                    {
-                        "role": "model",
-                        "parts": [
-                            genai.types.FunctionCall(
-                                name=m.tool_name,
-                                args=args,
-                            )
-                        ],
-                    }
-                )
-                if m.tool_output:
-                    tool_output = json.loads(m.tool_output)
-                    history.append(
-                        {
-                            "role": "function",
-                            "parts": [
-                                genai.types.FunctionResponse(
-                                    name=m.tool_name,
-                                    response=tool_output,
-                                )
-                            ],
-                        }
-                    )
-                continue
-            except Exception:
-                # Corrupt/legacy JSON in tool fields; just fall through and use text.
-                pass
-
-        if m.text:
-            role = "user" if m.sender == "user" else "model"
-            history.append({"role": role, "parts": [m.text]})
-
-    # 5. Interaction Loop
-    ai_text = ""
-    mcp = MCPTools()
-    t_name: Optional[str] = None
-    t_args: Optional[str] = None
-    t_out: Optional[str] = None
+        # 4. History Reconstruction from committed rows (cached per conversation),
+        # plus the current message; the cached list itself is left untouched
+        history = _load_history(session, conv_id) if conv_id is not None else []
+        history = history + [{"role": "user", "parts": [req.message]}]
+        # End the read transaction so no connection is held while awaiting Gemini
+        session.rollback()
 
-    try:
-        chat = model.start_chat(history=history)
-        response = await chat.send_message_async(req.message)
-
-        for part in response.parts:
-            if part.text:
-                ai_text += part.text
-            if part.function_call:
-                t_name = part.function_call.name
-                # Serialize tool arguments safely
-                t_args = json.dumps(dict(part.function_call.args))
-
-                # Execute tool (add_task, list_tasks, etc.) with JSON-safe arguments
-                res = getattr(mcp, t_name)(user_id=user_id, **part.function_call.args)
-                # Store tool output as JSON for persistence
-                t_out = json.dumps(res)
-
-                # Prepare a JSON-safe response object for Gemini
-                safe_tool_response = json.loads(t_out)
-
-                # Await final summary from AI after tool call
-                final_resp = await chat.send_message_async(
-                    genai.types.FunctionResponse(
-                        name=t_name,
-                        response=safe_tool_response,
+        # 5. Interaction Loop
+        ai_text = ""
+        mcp = MCPTools(session)
+        t_name: Optional[str] = None
+        t_args: Optional[dict] = None
+        t_out = None
+
+        try:
+            chat = model.start_chat(history=history)
+            response = await chat.send_message_async(req.message)
+
+            for part in response.parts:
+                if part.text:
+                    ai_text += part.text
+                if part.function_call:
+                    t_name = part.function_call.name
+                    # Tool arguments are stored as-is in a JSON column
+                    call_args = dict(part.function_call.args)
+                    t_args = call_args
+
+                    # Execute tool (add_task, list_tasks, etc.) with JSON-safe arguments
+                    res = getattr(mcp, t_name)(user_id=user_id, **call_args)
+                    # Tool output is stored as-is in a JSON column
+                    t_out = res
+
+                    # Single-task results have a fixed shape; skip the second round trip
+                    templated = _templated_tool_reply(t_name, call_args, res)
+                    if templated is not None:
+                        ai_text = templated
+                        continue
+
+                    # Await final summary from AI after tool call
+                    final_resp = await chat.send_message_async(
+                        genai.types.FunctionResponse(
+                            name=t_name,
+                            response=res,
+                        )
                     )
-                )
 
-                # SAFETY FALLBACK: ensure we always have user-visible text
-                if final_resp.text:
-                    ai_text = final_resp.text
-                else:
-                    ai_text = "Task processed successfully!"
-    except Exception:
-        # Gemini or network error: fall back to a simple rule-based handler
-        ai_text, t_name, t_out = _rule_based_tool_handler(user_id, req.message, mcp)
+                    # SAFETY FALLBACK: ensure we always have user-visible text
+                    if final_resp.text:
+                        ai_text = final_resp.text
+                    else:
+                        ai_text = "Task processed successfully!"
+        except Exception:
+            # Gemini or network error: fall back to a simple rule-based handler
+            ai_text, t_name, t_out = _rule_based_tool_handler(user_id, req.message, mcp)
 
-    # Global safety fallback in case no text was produced at all
-    if not ai_text or not ai_text.strip():
-        ai_text = "Task processed successfully!"
+        # Global safety fallback in case no text was produced at all
+        if not ai_text or not ai_text.strip():
+            ai_text = "Task processed successfully!"
+
+        # 6. Save User Message and AI Response in one transaction
+        ai_msg = Message(
+            **conv_ref, user_id=user_id, sender="model",
+            text=ai_text, tool_name=t_name, tool_arguments=t_args, tool_output=t_out
+        )
+        session.add_all([user_msg, ai_msg])
+        if conv_id is None:
+            # Read the new id before commit expires the objects (avoids a reload SELECT)
+            session.flush()
+            conv_id = conv_ref["conversation"].id
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
 
-    # 6. Save AI Response
-    ai_msg = Message(
-        conversation_id=conv.id, user_id=user_id, sender="model", 
-        text=ai_text, tool_name=t_name, tool_arguments=t_args, tool_output=t_out
-    )
-    session.add(ai_msg)
-    session.commit()
-    
-    return {"response": ai_text, "conversation_id": conv.id}
\ No newline at end of file
+    return {"response": ai_text, "conversation_id": conv_id}
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import orjson
 from dotenv import load_dotenv
 from sqlmodel import SQLModel, create_engine, Session
 from models import Task, Conversation, Message
@@ -12,7 +13,26 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL is not set in .env file")
 
-engine = create_engine(DATABASE_URL, echo=True)
+connect_args = {}
+# Opt-in cap on runaway Postgres queries. It is sent as a startup option, which
+# Neon's pooled (-pooler) endpoint rejects, so only set it on direct connections.
+statement_timeout_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+if DATABASE_URL.startswith("postgres") and statement_timeout_ms > 0:
+    connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+
+# SQL_ECHO=1 logs every statement; keep it off outside local debugging
+engine = create_engine(
+    DATABASE_URL,
+    echo=os.getenv("SQL_ECHO", "0") == "1",
+    pool_pre_ping=True,
+    pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+    max_overflow=40,
+    pool_recycle=1800,
+    connect_args=connect_args,
+    # Used for the JSON tool columns on Message
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
+)
 
 def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
@@ -1,6 +1,9 @@
 import os
+import functools
 from fastapi import FastAPI
+from fastapi.dependencies import utils as dependency_utils
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
 from database import create_db_and_tables
 from routes import router as tasks_router
@@ -9,6 +12,37 @@ from chat_routes import router as chat_router
 
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
+
+def _memoize_introspection(func):
+    cached = functools.lru_cache(maxsize=512)(func)
+
+    @functools.wraps(func)
+    def wrapper(call):
+        try:
+            return cached(call)
+        except TypeError:
+            # Unhashable dependency callable; inspect it every time
+            return func(call)
+
+    return wrapper
+
+
+def cache_dependency_introspection() -> None:
+    """
+    Memoize FastAPI's per-request dependency introspection.
+
+    solve_dependencies() re-inspects every dependency callable (get_session,
+    get_current_user_id, ...) on each request to decide how to invoke it.
+    The answer never changes for a given callable, so cache it once.
+    """
+    for name in ("is_coroutine_callable", "is_gen_callable", "is_async_gen_callable"):
+        original = getattr(dependency_utils, name, None)
+        if original is not None:
+            setattr(dependency_utils, name, _memoize_introspection(original))
+
+
+cache_dependency_introspection()
+
 app = FastAPI(title="TaskFlow API")
 
 # Strict CORS configuration for Next.js frontend
@@ -21,6 +55,9 @@ app.add_middleware(
     
 )
 
+# Compress larger JSON bodies (task lists, long chat replies)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 app.include_router(tasks_router)
 app.include_router(auth_router)
 app.include_router(chat_router)
@@ -30,5 +67,19 @@ def on_startup():
     create_db_and_tables()
 
 if __name__ == "__main__":
+    import sys
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+
+    debug = os.getenv("DEBUG", "0") == "1"
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        # C event loop and HTTP parser from uvicorn[standard]; uvloop has no Windows build
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        reload=debug,
+        # Registered users live in per-process dicts (auth.py), so more than one
+        # worker needs a shared user store first
+        workers=None if debug else int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
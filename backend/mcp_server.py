@@ -1,65 +1,82 @@
+import functools
 from typing import Optional
 from sqlmodel import Session, select
-from database import engine
 from models import Task
 from datetime import datetime
 from datetime import datetime
 
 class MCPTools:
+    def __init__(self, session: Session):
+        # Tools run inside the caller's session so a chat request shares one connection.
+        # Each call builds its result and then commits, ending its transaction (and row locks)
+        # before the caller awaits Gemini again.
+        self.session = session
+
     def add_task(self, user_id: str, title: str, description: Optional[str] = None):
-        with Session(engine) as session:
-            task = Task(user_id=user_id, title=title, description=description)
-            session.add(task)
-            session.commit()
-            session.refresh(task)
-            return {"id": task.id, "title": task.title, "status": "created"}
+        task = Task(user_id=user_id, title=title, description=description)
+        self.session.add(task)
+        self.session.flush()
+        result = {"id": task.id, "title": task.title, "status": "created"}
+        self.session.commit()
+        return result
 
     def list_tasks(self, user_id: str, status: Optional[str] = None):
-        with Session(engine) as session:
-            statement = select(Task).where(Task.user_id == user_id)
-            if status:
-                statement = statement.where(Task.status == status)
-            tasks = session.exec(statement).all()
-            return [{"id": t.id, "title": t.title, "description": t.description, "status": t.status} for t in tasks]
+        statement = select(Task).where(Task.user_id == user_id)
+        if status:
+            statement = statement.where(Task.status == status)
+        tasks = self.session.exec(statement).all()
+        result = [{"id": t.id, "title": t.title, "description": t.description, "status": t.status} for t in tasks]
+        self.session.commit()
+        return result
+
+    def find_tasks_by_title(self, user_id: str, title_query: str, limit: int = 2):
+        statement = (
+            select(Task)
+            .where(Task.user_id == user_id, Task.title.icontains(title_query, autoescape=True))
+            .limit(limit)
+        )
+        tasks = self.session.exec(statement).all()
+        result = [{"id": t.id, "title": t.title, "status": t.status} for t in tasks]
+        self.session.commit()
+        return result
 
     def complete_task(self, user_id: str, task_id: int):
-        with Session(engine) as session:
-            task = session.get(Task, task_id)
-            if not task or task.user_id != user_id:
-                return {"error": "Task not found or unauthorized"}
-            task.status = "completed"
-            task.updated_at = datetime.utcnow()
-            session.add(task)
-            session.commit()
-            session.refresh(task)
-            return {"id": task.id, "title": task.title, "status": task.status}
+        task = self.session.get(Task, task_id)
+        if not task or task.user_id != user_id:
+            return {"error": "Task not found or unauthorized"}
+        task.status = "completed"
+        task.updated_at = datetime.utcnow()
+        self.session.add(task)
+        result = {"id": task.id, "title": task.title, "status": task.status}
+        self.session.commit()
+        return result
 
     def delete_task(self, user_id: str, task_id: int):
-        with Session(engine) as session:
-            task = session.get(Task, task_id)
-            if not task or task.user_id != user_id:
-                return {"error": "Task not found or unauthorized"}
-            session.delete(task)
-            session.commit()
-            return {"status": "success", "message": f"Task {task_id} deleted."}
+        task = self.session.get(Task, task_id)
+        if not task or task.user_id != user_id:
+            return {"error": "Task not found or unauthorized"}
+        self.session.delete(task)
+        self.session.commit()
+        return {"status": "success", "message": f"Task {task_id} deleted."}
 
     def update_task(self, user_id: str, task_id: int, title: Optional[str] = None, description: Optional[str] = None, status: Optional[str] = None):
-        with Session(engine) as session:
-            task = session.get(Task, task_id)
-            if not task or task.user_id != user_id:
-                return {"error": "Task not found or unauthorized"}
-            if title is not None:
-                task.title = title
-            if description is not None:
-                task.description = description
-            if status is not None:
-                task.status = status
-            task.updated_at = datetime.utcnow()
-            session.add(task)
-            session.commit()
-            session.refresh(task)
-            return {"id": task.id, "title": task.title, "description": task.description, "status": task.status}
+        task = self.session.get(Task, task_id)
+        if not task or task.user_id != user_id:
+            return {"error": "Task not found or unauthorized"}
+        if title is not None:
+            task.title = title
+        if description is not None:
+            task.description = description
+        if status is not None:
+            task.status = status
+        task.updated_at = datetime.utcnow()
+        self.session.add(task)
+        result = {"id": task.id, "title": task.title, "description": task.description, "status": task.status}
+        self.session.commit()
+        return result
 
+# The schema never changes at runtime; build it once and share it
+@functools.cache
 def get_gemini_tool_definitions():
     return [{"function_declarations": [
         {"name": "add_task", "description": "Add a new task to the user's todo list.",
@@ -1,7 +1,8 @@
-from typing import Optional, List
+from typing import Any, Optional, List
 from datetime import datetime
 from sqlmodel import Field, SQLModel, Relationship
-from sqlalchemy import Column, Integer
+from sqlalchemy import JSON, Column, Index, Integer
+from sqlalchemy.dialects.postgresql import JSONB
 
 # --- Essential Classes for routes.py ---
 class TaskCreate(SQLModel):
@@ -32,14 +33,20 @@ class Conversation(SQLModel, table=True):
     messages: List["Message"] = Relationship(back_populates="conversation")
 
 class Message(SQLModel, table=True):
-    __table_args__ = {'extend_existing': True}
+    # History is always read per conversation in timestamp order; the composite
+    # index serves that query and any conversation_id-only lookup.
+    __table_args__ = (
+        Index("ix_msg_conv_ts", "conversation_id", "timestamp"),
+        {'extend_existing': True},
+    )
     id: Optional[int] = Field(default=None, sa_column=Column(Integer, primary_key=True, autoincrement=True))
-    conversation_id: int = Field(foreign_key="conversation.id", index=True)
+    conversation_id: int = Field(foreign_key="conversation.id")
     user_id: str = Field(index=True)
     sender: str = Field(max_length=10)
     text: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     tool_name: Optional[str] = None
-    tool_arguments: Optional[str] = None
-    tool_output: Optional[str] = None
+    # none_as_null: store Python None as SQL NULL, not the JSON literal 'null'
+    tool_arguments: Optional[dict] = Field(default=None, sa_column=Column(JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")))
+    tool_output: Optional[Any] = Field(default=None, sa_column=Column(JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql")))
     conversation: "Conversation" = Relationship(back_populates="messages")
\ No newline at end of file
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("sqlmodel")
+pytest.importorskip("google.generativeai")
+
+# database.py requires a URL at import time; the fallback tests never connect
+os.environ.setdefault("DATABASE_URL", "sqlite:///test_chat_routes.db")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from chat_routes import _parse_intent, _rule_based_tool_handler
+
+
+class FakeMCP:
+    """In-memory stand-in for MCPTools covering the calls the fallback makes."""
+
+    def __init__(self):
+        self.tasks = {1: {"id": 1, "title": "Buy milk", "status": "pending"}}
+
+    def list_tasks(self, user_id, status=None):
+        return list(self.tasks.values())
+
+    def complete_task(self, user_id, task_id):
+        if task_id not in self.tasks:
+            return {"error": "Task not found or unauthorized"}
+        self.tasks[task_id]["status"] = "completed"
+        return dict(self.tasks[task_id])
+
+
+@pytest.mark.parametrize("message", ["list tasks", "SHOW TASKS", "lıst tasks", "lİst tasks"])
+def test_fallback_lists_tasks_for_case_variants(message):
+    ai_text, tool_name, tool_output = _rule_based_tool_handler("u1", message, FakeMCP())
+    assert tool_name == "list_tasks"
+    assert ai_text == "Here are your tasks: 1: Buy milk (pending)."
+    assert tool_output == [{"id": 1, "title": "Buy milk", "status": "pending"}]
+
+
+def test_parse_intent_reads_task_id_after_alias():
+    assert _parse_intent("Mark Task 1 done") == ("complete task", 1, "1 done")
+    assert _parse_intent("hello") == (None, None, "")
+
+
+def test_fallback_completes_task_by_id():
+    ai_text, tool_name, _ = _rule_based_tool_handler("u1", "complete task 1", FakeMCP())
+    assert tool_name == "complete_task"
+    assert ai_text == "Task 1 marked as completed."
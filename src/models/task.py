@@ -7,15 +7,21 @@ Task data model for the Todo Console App.
 This module defines the Task dataclass representing a single todo item.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 
+# Display format for task timestamps
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
 
-@dataclass
+
+@dataclass(slots=True)
 class Task:
     """
     Represents a single todo task.
     
+    Instances are slotted (no per-instance ``__dict__``) and updated in place
+    by storage; use mark_updated() so updated_str stays in sync.
+    
     Attributes:
         id: Unique identifier (auto-generated, positive integer)
         title: Task title (required, 1-200 characters)
@@ -23,15 +29,18 @@ class Task:
         completed: Completion status (True = completed, False = pending)
         created_at: Creation timestamp (UTC, auto-set)
         updated_at: Last modification timestamp (UTC, auto-managed)
+        created_str: created_at formatted with TIMESTAMP_FORMAT (derived)
+        updated_str: updated_at formatted with TIMESTAMP_FORMAT (derived)
     
     Example:
+        >>> from datetime import timezone
         >>> task = Task(
         ...     id=1,
         ...     title="Buy groceries",
         ...     description="Milk, eggs, bread",
         ...     completed=False,
-        ...     created_at=datetime.utcnow(),
-        ...     updated_at=datetime.utcnow()
+        ...     created_at=datetime.now(timezone.utc),
+        ...     updated_at=datetime.now(timezone.utc)
         ... )
     """
     id: int
@@ -40,3 +49,25 @@ class Task:
     completed: bool
     created_at: datetime
     updated_at: datetime
+    created_str: str = field(init=False, repr=False, compare=False)
+    updated_str: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        """Format the timestamps once, when the task is written, not on every view."""
+        created_str = self.created_at.strftime(TIMESTAMP_FORMAT)
+        if self.updated_at == self.created_at:
+            updated_str = created_str
+        else:
+            updated_str = self.updated_at.strftime(TIMESTAMP_FORMAT)
+        self.created_str = created_str
+        self.updated_str = updated_str
+    
+    def mark_updated(self, now: datetime) -> None:
+        """
+        Set the last modification timestamp and its formatted string.
+        
+        Args:
+            now: Modification time (UTC)
+        """
+        self.updated_at = now
+        self.updated_str = now.strftime(TIMESTAMP_FORMAT)
@@ -8,10 +8,18 @@ This module implements the business logic for task operations,
 including input validation and coordination between storage and UI.
 """
 
-from storage.memory_store import MemoryStore
 from models.task import Task
 from models.exceptions import InvalidTaskDataError, TaskNotFoundError
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, Optional
+
+if TYPE_CHECKING:
+    # Only needed for annotations; keeps the service from importing storage
+    from storage.memory_store import MemoryStore
+
+# Validation messages, shared by add and update
+_TITLE_EMPTY = "Title cannot be empty"
+_TITLE_TOO_LONG = "Title cannot exceed 200 characters"
+_DESCRIPTION_TOO_LONG = "Description cannot exceed 1000 characters"
 
 
 class TaskService:
@@ -25,7 +33,7 @@ class TaskService:
         _store: MemoryStore instance for data persistence
     """
     
-    def __init__(self, store: MemoryStore) -> None:
+    def __init__(self, store: "MemoryStore") -> None:
         """
         Initialize the task service.
         
@@ -39,29 +47,29 @@ class TaskService:
         Validate task title.
         
         Args:
-            title: Task title to validate
+            title: Task title to validate (already stripped)
         
         Raises:
             InvalidTaskDataError: If validation fails
         """
-        if not title or len(title.strip()) == 0:
-            raise InvalidTaskDataError("Title cannot be empty")
+        if not title:
+            raise InvalidTaskDataError(_TITLE_EMPTY)
         
         if len(title) > 200:
-            raise InvalidTaskDataError("Title cannot exceed 200 characters")
+            raise InvalidTaskDataError(_TITLE_TOO_LONG)
     
     def _validate_description(self, description: str) -> None:
         """
         Validate task description.
         
         Args:
-            description: Task description to validate
+            description: Task description to validate (already stripped)
         
         Raises:
             InvalidTaskDataError: If validation fails
         """
         if len(description) > 1000:
-            raise InvalidTaskDataError("Description cannot exceed 1000 characters")
+            raise InvalidTaskDataError(_DESCRIPTION_TOO_LONG)
     
     def add_task(self, title: str, description: str = "") -> Task:
         """
@@ -83,13 +91,11 @@ class TaskService:
             >>> print(task.id)
             1
         """
-        # Validate inputs
-        self._validate_title(title)
-        self._validate_description(description)
-        
-        # Strip whitespace
+        # Strip whitespace once, then validate what will be stored
         title = title.strip()
         description = description.strip()
+        self._validate_title(title)
+        self._validate_description(description)
         
         # Create task
         return self._store.create(title, description)
@@ -109,6 +115,29 @@ class TaskService:
         """
         return self._store.get_all()
     
+    def iter_tasks(self) -> Iterable[Task]:
+        """
+        Iterate over all tasks without building a list.
+        
+        Returns:
+            Iterable of all Task objects, in creation order (may be empty)
+        """
+        return self._store.iter_all()
+    
+    def task_count(self) -> int:
+        """
+        Count stored tasks.
+        
+        Returns:
+            Number of tasks
+        
+        Example:
+            >>> service = TaskService(MemoryStore())
+            >>> service.task_count()
+            0
+        """
+        return len(self._store)
+    
     def get_task(self, task_id: int) -> Optional[Task]:
         """
         Retrieve a task by ID.
@@ -150,13 +179,11 @@ class TaskService:
             >>> updated.title
             'Buy groceries and fruits'
         """
-        # Validate inputs
-        self._validate_title(title)
-        self._validate_description(description)
-        
-        # Strip whitespace
+        # Strip whitespace once, then validate what will be stored
         title = title.strip()
         description = description.strip()
+        self._validate_title(title)
+        self._validate_description(description)
         
         # Update task
         return self._store.update(task_id, title, description)
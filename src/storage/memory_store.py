@@ -8,12 +8,17 @@ This module provides a dictionary-based in-memory storage implementation
 for managing Task objects during the application session.
 """
 
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from functools import partial
+from itertools import count
+from typing import Iterable, Iterator, Optional
 
 from models.task import Task
 from models.exceptions import TaskNotFoundError
 
+# Current UTC time, bound once so each call skips the attribute lookups
+_utcnow = partial(datetime.now, timezone.utc)
+
 
 class MemoryStore:
     """
@@ -23,28 +28,15 @@ class MemoryStore:
     Data is lost when the application exits (expected behavior for Phase I).
     
     Attributes:
-        _tasks: Dictionary mapping task IDs to Task objects
-        _next_id: Auto-increment counter for generating unique task IDs
+        _tasks: Dictionary mapping task IDs to Task objects (in creation order)
+        _ids: Auto-increment counter for generating unique task IDs
+            (IDs are never reused, even after deletion)
     """
     
     def __init__(self) -> None:
         """Initialize empty storage with ID counter starting at 1."""
         self._tasks: dict[int, Task] = {}
-        self._next_id: int = 1
-    
-    def _generate_id(self) -> int:
-        """
-        Generate next unique task ID.
-        
-        Returns:
-            Next available ID (auto-incremented)
-        
-        Note:
-            IDs are never reused, even after deletion.
-        """
-        current_id = self._next_id
-        self._next_id += 1
-        return current_id
+        self._ids: Iterator[int] = count(1)
     
     def create(self, title: str, description: str = "") -> Task:
         """
@@ -60,8 +52,8 @@ class MemoryStore:
         Note:
             Validation should be performed in the service layer before calling this method.
         """
-        task_id = self._generate_id()
-        now = datetime.utcnow()
+        task_id = next(self._ids)
+        now = _utcnow()
         
         task = Task(
             id=task_id,
@@ -95,10 +87,27 @@ class MemoryStore:
             List of all Task objects (may be empty)
         
         Note:
-            Tasks are returned in arbitrary order (dictionary iteration order).
+            Tasks are returned in creation order: dicts preserve insertion
+            order, and updates modify tasks in place.
         """
         return list(self._tasks.values())
     
+    def iter_all(self) -> Iterable[Task]:
+        """
+        Iterate over all tasks without copying them into a list.
+        
+        Returns:
+            Live view of the stored Task objects, in creation order
+        
+        Note:
+            Don't create or delete tasks while iterating over the view.
+        """
+        return self._tasks.values()
+    
+    def __len__(self) -> int:
+        """Return the number of stored tasks."""
+        return len(self._tasks)
+    
     def update(self, task_id: int, title: str, description: str) -> Task:
         """
         Update an existing task.
@@ -122,18 +131,11 @@ class MemoryStore:
         if task is None:
             raise TaskNotFoundError(f"Task {task_id} not found")
         
-        # Create updated task (following immutable pattern)
-        updated_task = Task(
-            id=task.id,
-            title=title,
-            description=description,
-            completed=task.completed,
-            created_at=task.created_at,
-            updated_at=datetime.utcnow()
-        )
-        
-        self._tasks[task_id] = updated_task
-        return updated_task
+        # Update in place; nothing depends on a task being replaced
+        task.title = title
+        task.description = description
+        task.mark_updated(_utcnow())
+        return task
     
     def delete(self, task_id: int) -> bool:
         """
@@ -148,10 +150,8 @@ class MemoryStore:
         Note:
             Deleted task IDs are never reused.
         """
-        if task_id in self._tasks:
-            del self._tasks[task_id]
-            return True
-        return False
+        # Single lookup; stored values are never None
+        return self._tasks.pop(task_id, None) is not None
     
     def toggle_completion(self, task_id: int) -> Task:
         """
@@ -174,14 +174,6 @@ class MemoryStore:
         if task is None:
             raise TaskNotFoundError(f"Task {task_id} not found")
         
-        updated_task = Task(
-            id=task.id,
-            title=task.title,
-            description=task.description,
-            completed=not task.completed,  # Toggle
-            created_at=task.created_at,
-            updated_at=datetime.utcnow()
-        )
-        
-        self._tasks[task_id] = updated_task
-        return updated_task
+        task.completed = not task.completed  # Toggle
+        task.mark_updated(_utcnow())
+        return task
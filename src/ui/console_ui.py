@@ -8,10 +8,18 @@ This module handles all user interaction, including menu display,
 input collection, and output formatting.
 """
 
+from typing import TYPE_CHECKING, Callable
+
 from services.task_service import TaskService
-from models.task import Task
 from models.exceptions import InvalidTaskDataError, TaskNotFoundError
 
+if TYPE_CHECKING:
+    # Only needed for annotations; the UI never constructs tasks
+    from models.task import Task
+
+# Display template for a single task (see _format_task)
+_TASK_TEMPLATE = "ID: %d\nTitle: %s\nDescription: %s\nStatus: %s\nCreated: %s\nUpdated: %s\n---"
+
 
 class ConsoleUI:
     """
@@ -23,6 +31,17 @@ class ConsoleUI:
         _service: TaskService instance for business operations
     """
     
+    # Main menu, built once; print() adds the trailing blank line
+    _MENU = (
+        "\n=== Todo App ===\n"
+        "1. Add Task\n"
+        "2. View All Tasks\n"
+        "3. Update Task\n"
+        "4. Delete Task\n"
+        "5. Mark Task Complete/Incomplete\n"
+        "6. Exit\n"
+    )
+    
     def __init__(self, service: TaskService) -> None:
         """
         Initialize the console UI.
@@ -42,16 +61,9 @@ class ConsoleUI:
     
     def _display_menu(self) -> None:
         """Display the main menu."""
-        print("\n=== Todo App ===")
-        print("1. Add Task")
-        print("2. View All Tasks")
-        print("3. Update Task")
-        print("4. Delete Task")
-        print("5. Mark Task Complete/Incomplete")
-        print("6. Exit")
-        print()
+        print(self._MENU)
     
-    def _format_task(self, task: Task) -> str:
+    def _format_task(self, task: "Task") -> str:
         """
         Format a task for display.
         
@@ -61,17 +73,14 @@ class ConsoleUI:
         Returns:
             Formatted string representation of the task
         """
-        status = "Completed" if task.completed else "Pending"
-        created = task.created_at.strftime("%Y-%m-%d %H:%M:%S")
-        updated = task.updated_at.strftime("%Y-%m-%d %H:%M:%S")
-        
-        return f"""ID: {task.id}
-Title: {task.title}
-Description: {task.description}
-Status: {status}
-Created: {created}
-Updated: {updated}
----"""
+        return _TASK_TEMPLATE % (
+            task.id,
+            task.title,
+            task.description,
+            "Completed" if task.completed else "Pending",
+            task.created_str,
+            task.updated_str,
+        )
     
     def _get_int_input(self, prompt: str) -> int:
         """
@@ -87,11 +96,13 @@ Updated: {updated}
             Keeps prompting until valid integer is entered.
         """
         while True:
-            try:
-                value = input(prompt)
+            value = input(prompt).strip()
+            # Check the digits up front instead of raising ValueError on every typo;
+            # isdecimal() accepts exactly the characters int() does
+            digits = value[1:] if value[:1] in ("-", "+") else value
+            if digits.isdecimal():
                 return int(value)
-            except ValueError:
-                print("Error: Please enter a valid task ID (number)")
+            print("Error: Please enter a valid task ID (number)")
     
     def add_task_ui(self) -> None:
         """Handle Add Task feature UI."""
@@ -121,13 +132,11 @@ Updated: {updated}
         """Handle View All Tasks feature UI."""
         print("\n=== All Tasks ===\n")
         
-        tasks = self._service.get_all_tasks()
-        
-        if not tasks:
+        if not self._service.task_count():
             print("No tasks found. Add a task to get started!")
         else:
-            for task in tasks:
-                print(self._format_task(task))
+            # One write for the whole list instead of one print per task
+            print("\n".join(map(self._format_task, self._service.iter_tasks())))
         
         self._pause()
     
@@ -205,27 +214,29 @@ Updated: {updated}
         
         task_id = self._get_int_input("Enter task ID to toggle completion: ")
         
-        # Check if task exists
-        task = self._service.get_task(task_id)
-        if task is None:
-            print(f"\nError: Task {task_id} not found")
-            self._pause()
-            return
-        
-        # Show current status
-        current_status = "Completed" if task.completed else "Pending"
-        print(f"\nCurrent Status: {current_status}")
-        
         try:
-            # Toggle completion
+            # Toggle completion; the service raises if the task doesn't exist
             updated_task = self._service.toggle_completion(task_id)
-            new_status = "completed" if updated_task.completed else "incomplete"
-            print(f"\nTask {task_id} marked as {new_status}!")
         except TaskNotFoundError as e:
             print(f"\nError: {e}")
+        else:
+            # Status before the toggle is the opposite of the new one
+            current_status = "Pending" if updated_task.completed else "Completed"
+            print(f"\nCurrent Status: {current_status}")
+            new_status = "completed" if updated_task.completed else "incomplete"
+            print(f"\nTask {task_id} marked as {new_status}!")
         
         self._pause()
     
+    # Menu choice -> feature handler (Exit is handled in run)
+    _HANDLERS: dict[str, Callable[["ConsoleUI"], None]] = {
+        "1": add_task_ui,
+        "2": view_tasks_ui,
+        "3": update_task_ui,
+        "4": delete_task_ui,
+        "5": toggle_completion_ui,
+    }
+    
     def run(self) -> None:
         """
         Run the main application loop.
@@ -237,17 +248,10 @@ Updated: {updated}
             
             try:
                 choice = input("Enter your choice: ")
+                handler = self._HANDLERS.get(choice)
                 
-                if choice == "1":
-                    self.add_task_ui()
-                elif choice == "2":
-                    self.view_tasks_ui()
-                elif choice == "3":
-                    self.update_task_ui()
-                elif choice == "4":
-                    self.delete_task_ui()
-                elif choice == "5":
-                    self.toggle_completion_ui()
+                if handler is not None:
+                    handler(self)
                 elif choice == "6":
                     print("\nThank you for using Todo App. Goodbye!")
                     break